@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
+import uvicorn
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from app import validate_search_input, get_search_suggestions, initialize_tools, execute_tool
+
+# How long a successful tool result is served from memory before hitting the upstream API again
+RESULT_CACHE_SECONDS = int(os.getenv("API_CACHE_SECONDS", "300"))
+RESULT_CACHE_SIZE = 1024
+
+# Threads available for blocking tool calls; these are I/O-bound, so far more than AnyIO's default of 40
+TOOL_THREADS = int(os.getenv("API_TOOL_THREADS", "256"))
+
+# Cached results keyed by (tool, normalized query) -> (expires_at, body, etag)
+_result_cache = OrderedDict()
+
+# Searches currently running upstream, so concurrent identical requests share one call
+_in_flight = {}
+
+def make_etag(body):
+    """Return a strong ETag for a response body"""
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+def encode_json(payload):
+    """Serialize a payload the same way for every response so ETags stay stable"""
+    return json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+
+def json_response(request, body, status_code=200, etag=None, max_age=0):
+    """Build a JSON response with ETag/If-None-Match support"""
+    if status_code != 200:
+        return Response(body, status_code=status_code, media_type="application/json",
+                        headers={"Cache-Control": "no-store"})
+
+    etag = etag or make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    return Response(body, media_type="application/json", headers=headers)
+
+def get_cached_result(key):
+    """Return the cached (body, etag) for a search, or None if missing or expired"""
+    entry = _result_cache.get(key)
+    if entry is None:
+        return None
+
+    expires_at, body, etag = entry
+    if expires_at < time.monotonic():
+        del _result_cache[key]
+        return None
+
+    _result_cache.move_to_end(key)
+    return body, etag
+
+def cache_result(key, body, etag):
+    """Store a search result, evicting the least recently used entries"""
+    _result_cache[key] = (time.monotonic() + RESULT_CACHE_SECONDS, body, etag)
+    _result_cache.move_to_end(key)
+    while len(_result_cache) > RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+
+async def run_search(tools, query, tool_name):
+    """Run a search off the event loop, returning (result, body, etag, cached)"""
+    key = (tool_name, " ".join(query.lower().split()))
+
+    cached = get_cached_result(key)
+    if cached:
+        body, etag = cached
+        return None, body, etag, True
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(run_in_threadpool(execute_tool, query, tool_name, tools))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+
+    result = await asyncio.shield(task)
+    body = encode_json(result)
+    etag = make_etag(body)
+
+    # Errors are never cached so a transient upstream failure is retried on the next request;
+    # Local answers are already instant and change as the index grows
+    if "error" not in result and tool_name != "Local":
+        cache_result(key, body, etag)
+
+    return result, body, etag, False
+
+def error_body(message, suggestions=None):
+    """Encode a client error payload"""
+    return encode_json({"error": message, "suggestions": suggestions or []})
+
+def parse_search_request(request):
+    """Validate the query of a search request, returning (query, error_response)"""
+    query = request.query_params.get("q", "")
+    is_valid, validation_message, suggestions = validate_search_input(query)
+    if not is_valid:
+        return None, json_response(request, error_body(validation_message, suggestions), status_code=422)
+    return query.strip(), None
+
+async def search(request):
+    """GET /search?q=<query>&tool=<tool>: run one tool and return its formatted result"""
+    tools = request.app.state.tools
+    tool_name = request.query_params.get("tool", "Wikipedia")
+    if tool_name not in tools:
+        message = f"Unknown tool '{tool_name}'. Available tools: {', '.join(tools)}"
+        return json_response(request, error_body(message), status_code=400)
+
+    query, error_response = parse_search_request(request)
+    if error_response:
+        return error_response
+
+    result, body, etag, cached = await run_search(tools, query, tool_name)
+    if result is not None and "error" in result:
+        return json_response(request, body, status_code=502)
+
+    response = json_response(request, body, etag=etag, max_age=RESULT_CACHE_SECONDS)
+    response.headers["X-Cache"] = "HIT" if cached else "MISS"
+    return response
+
+async def search_all(request):
+    """GET /search/all?q=<query>[&tools=A,B]: stream every tool's result as NDJSON as soon as it is ready"""
+    tools = request.app.state.tools
+    requested = request.query_params.get("tools")
+    tool_names = [name.strip() for name in requested.split(",")] if requested else list(tools)
+    unknown = [name for name in tool_names if name not in tools]
+    if unknown:
+        message = f"Unknown tool(s) {', '.join(unknown)}. Available tools: {', '.join(tools)}"
+        return json_response(request, error_body(message), status_code=400)
+
+    query, error_response = parse_search_request(request)
+    if error_response:
+        return error_response
+
+    async def tagged_search(tool_name):
+        _, body, _, cached = await run_search(tools, query, tool_name)
+        return tool_name, body, cached
+
+    async def stream_results():
+        for next_done in asyncio.as_completed([tagged_search(name) for name in tool_names]):
+            tool_name, body, cached = await next_done
+            # The result body is already encoded JSON, so splice it in instead of re-serializing
+            yield b'{"tool": ' + encode_json(tool_name) + b', "cached": ' + encode_json(cached) + b', "result": ' + body + b'}\n'
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache"})
+
+async def suggest(request):
+    """GET /suggest?q=<query>: validate a query and return search suggestions"""
+    query = request.query_params.get("q", "")
+    is_valid, validation_message, suggestions = validate_search_input(query)
+    body = encode_json({
+        "query": query.strip(),
+        "valid": is_valid,
+        "message": validation_message,
+        "suggestions": suggestions or get_search_suggestions(query)
+    })
+    return json_response(request, body, max_age=3600)
+
+@asynccontextmanager
+async def lifespan(app):
+    # Tools are created once per server process and shared by every request
+    app.state.tools = initialize_tools()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = TOOL_THREADS
+    yield
+
+app = Starlette(
+    routes=[
+        Route("/search", search),
+        Route("/search/all", search_all),
+        Route("/suggest", suggest),
+    ],
+    middleware=[Middleware(GZipMiddleware, minimum_size=500, compresslevel=6)],
+    lifespan=lifespan
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the LangChain Tools Playground as an HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of server processes (default: 1)")
+    args = parser.parse_args()
+
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers, timeout_keep_alive=30)
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,63 @@ from langchain_community.utilities import WikipediaAPIWrapper
 from langchain_community.tools import YouTubeSearchTool
 from langchain_tavily import TavilySearch
 from langchain.schema import StrOutputParser
+from langchain_core.tools import BaseTool
 import json
 import re
-from urllib.parse import urlparse
+import sqlite3
+import time
+import uuid
+from urllib.parse import urlparse, quote
 import difflib
+import worker
 
 load_dotenv()
 
+# "inline" runs tools on the Streamlit script thread, "worker" hands them to the worker.py pool
+SERVING_MODE = os.getenv("SERVING_MODE", "inline")
+
+# How long the submitting run waits on a worker job before handing it off to polling
+JOB_WAIT_SECONDS = 3
+
+# How often a pending worker job is polled without blocking the rest of the page
+JOB_POLL_SECONDS = 1
+
+# Local full-text index of every result fetched through the app
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", "local_index.db")
+
+LOCAL_INDEX_SCHEMA = """
+PRAGMA journal_mode=WAL;
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    doc_key TEXT UNIQUE NOT NULL,
+    tool TEXT NOT NULL,
+    query TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    content TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, content, url, query,
+    content='documents', content_rowid='id',
+    tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, title, content, url, query)
+    VALUES (new.id, new.title, new.content, new.url, new.query);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, content, url, query)
+    VALUES ('delete', old.id, old.title, old.content, old.url, old.query);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_au AFTER UPDATE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, title, content, url, query)
+    VALUES ('delete', old.id, old.title, old.content, old.url, old.query);
+    INSERT INTO documents_fts(rowid, title, content, url, query)
+    VALUES (new.id, new.title, new.content, new.url, new.query);
+END;
+"""
+
 # Common search terms database for suggestions
 COMMON_SEARCH_TERMS = [
     # Popular places
@@ -82,16 +132,182 @@ def get_search_suggestions(query, max_suggestions=3):
     
     return matches
 
+# Index files whose schema has already been set up by this process
+_initialized_indexes = set()
+
+def get_index_connection(index_path=None):
+    """Open the local full-text index, creating the schema on first use"""
+    index_path = index_path or LOCAL_INDEX_PATH
+    conn = sqlite3.connect(index_path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    if index_path not in _initialized_indexes:
+        conn.executescript(LOCAL_INDEX_SCHEMA)
+        _initialized_indexes.add(index_path)
+    return conn
+
+def extract_documents(query, tool_name, content):
+    """Split a raw tool response into indexable documents with title, url and content"""
+    documents = []
+
+    if tool_name == "Wikipedia":
+        # WikipediaAPIWrapper returns "Page: <title>\nSummary: <text>" blocks separated by blank lines
+        for block in re.split(r'\n\s*\n(?=Page: )', str(content)):
+            match = re.match(r'Page: (.+)\nSummary: (.*)', block.strip(), re.DOTALL)
+            if match:
+                title = match.group(1).strip()
+                documents.append({
+                    "title": title,
+                    "url": f"https://en.wikipedia.org/wiki/{quote(title.replace(' ', '_'), safe='()')}",
+                    "content": match.group(2).strip()
+                })
+    elif tool_name == "Tavily":
+        if isinstance(content, str):
+            try:
+                content = json.loads(content)
+            except ValueError:
+                return documents
+        if isinstance(content, dict):
+            for item in content.get('results') or []:
+                if isinstance(item, dict) and item.get('url'):
+                    documents.append({
+                        "title": item.get('title') or item['url'],
+                        "url": item['url'],
+                        "content": item.get('content') or ''
+                    })
+    elif tool_name == "YouTube":
+        # Video URLs carry no text of their own, so the query is what makes them findable
+        for url in parse_youtube_urls(content):
+            documents.append({
+                "title": f"YouTube video for '{query.strip()}'",
+                "url": url,
+                "content": query.strip()
+            })
+
+    return documents
+
+def index_result(query, tool_name, result, index_path=None):
+    """Add the documents of a formatted tool result to the local index, returning how many were indexed"""
+    if "error" in result or tool_name == "Local":
+        return 0
+
+    documents = extract_documents(query, tool_name, result.get("content", ""))
+    if not documents:
+        return 0
+
+    now = time.time()
+    rows = [
+        (f"{tool_name}:{doc['url']}", tool_name, query.strip(), doc['title'], doc['url'], doc['content'], now)
+        for doc in documents
+    ]
+
+    conn = get_index_connection(index_path)
+    try:
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO documents (doc_key, tool, query, title, url, content, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(doc_key) DO UPDATE SET
+                    query = excluded.query,
+                    title = excluded.title,
+                    content = excluded.content,
+                    indexed_at = excluded.indexed_at
+                """,
+                rows
+            )
+    finally:
+        conn.close()
+
+    return len(rows)
+
+def search_local_index(query, max_results=8, index_path=None):
+    """Search the local index with BM25 ranking"""
+    terms = re.findall(r'\w+', query.lower())
+    if not terms:
+        return []
+
+    # Quote every term so user input can never be parsed as FTS5 query syntax
+    match_expression = " OR ".join(f'"{term}"' for term in terms)
+
+    conn = get_index_connection(index_path)
+    try:
+        rows = conn.execute(
+            """
+            SELECT d.tool, d.title, d.url, d.query,
+                   snippet(documents_fts, 1, '**', '**', '…', 32) AS snippet,
+                   bm25(documents_fts, 10.0, 1.0, 2.0, 5.0) AS rank
+            FROM documents_fts
+            JOIN documents d ON d.id = documents_fts.rowid
+            WHERE documents_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (match_expression, max_results)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    if not rows:
+        return []
+
+    # bm25() is negative with lower meaning better; scale to 0-1 relative to the best hit
+    best_rank = rows[0]["rank"]
+    return [
+        {
+            "title": row["title"],
+            "url": row["url"],
+            "content": row["snippet"],
+            "source_tool": row["tool"],
+            "source_query": row["query"],
+            "score": round(row["rank"] / best_rank, 3) if best_rank < 0 else 1.0
+        }
+        for row in rows
+    ]
+
+@st.cache_data(ttl=60, show_spinner=False)
+def count_indexed_documents(index_path=None):
+    """Return the number of documents in the local index, cached since it is shown on every rerun"""
+    # Don't create the index just to report that it is empty
+    if not os.path.exists(index_path or LOCAL_INDEX_PATH):
+        return 0
+
+    conn = get_index_connection(index_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+    finally:
+        conn.close()
+
+class LocalIndexSearch(BaseTool):
+    """LangChain tool answering queries from the local full-text index"""
+    name: str = "local_index_search"
+    description: str = (
+        "Search Wikipedia articles, web results and videos previously fetched by this app. "
+        "Works offline and never calls an upstream API."
+    )
+    index_path: str = LOCAL_INDEX_PATH
+    max_results: int = 8
+
+    def _run(self, query: str, run_manager=None) -> dict:
+        start = time.perf_counter()
+        results = search_local_index(query, self.max_results, self.index_path)
+        return {
+            "query": query.strip(),
+            "results": results,
+            "response_time": round(time.perf_counter() - start, 4)
+        }
+
 def initialize_tools():
     """Initialize the LangChain tools"""
     wikipedia = WikipediaQueryRun(api_wrapper=WikipediaAPIWrapper())
     youtube = YouTubeSearchTool()
     tavily = TavilySearch(api_key=os.getenv("TAVILY_API_KEY"))
-    
+    local = LocalIndexSearch()
+
     return {
         "Wikipedia": wikipedia,
         "YouTube": youtube,
-        "Tavily": tavily
+        "Tavily": tavily,
+        "Local": local
     }
 
 def format_response(response, tool_name):
@@ -118,6 +334,13 @@ def format_response(response, tool_name):
                 "source": "Tavily Search Engine",
                 "type": "web_search_results"
             }
+        elif tool_name == "Local":
+            return {
+                "tool": "local_index",
+                "content": response,
+                "source": "Local Full-Text Index",
+                "type": "local_search_results"
+            }
     except Exception as e:
         return {
             "tool": tool_name,
@@ -203,7 +426,7 @@ def execute_tool(query, selected_tool, tools):
     try:
         tool = tools[selected_tool]
         response = tool.invoke(query)
-        return format_response(response, selected_tool)
+        result = format_response(response, selected_tool)
     except Exception as e:
         return {
             "tool": selected_tool,
@@ -211,12 +434,38 @@ def execute_tool(query, selected_tool, tools):
             "content": f"Error executing {selected_tool} tool"
         }
 
+    try:
+        index_result(query, selected_tool, result)
+    except Exception:
+        # The local index is best-effort; a failed write must never fail the search
+        pass
+
+    return result
+
 def extract_youtube_links(text):
     """Extract YouTube video IDs from text"""
     youtube_pattern = r'(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]+)'
     matches = re.findall(youtube_pattern, str(text))
     return matches
 
+def parse_youtube_urls(content):
+    """Parse the video URLs out of a YouTube tool response"""
+    youtube_url_pattern = r'(https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[a-zA-Z0-9_-]+[^\s\'\"\]]*)'
+
+    # The YouTube tool returns a string that looks like a Python list
+    if isinstance(content, str):
+        try:
+            import ast
+            content = ast.literal_eval(content)
+        except Exception:
+            # If parsing fails, extract URLs using regex
+            return re.findall(youtube_url_pattern, content)
+
+    if not isinstance(content, list):
+        return []
+    # Only keep entries that really are video URLs, whatever else the list holds
+    return [item for item in content if isinstance(item, str) and re.fullmatch(youtube_url_pattern, item)]
+
 def extract_image_urls(text):
     """Extract image URLs from text"""
     image_pattern = r'https?://[^\s]+\.(?:jpg|jpeg|png|gif|webp|svg)'
@@ -234,14 +483,16 @@ def display_enhanced_results(result):
         "wikipedia": "📚", 
         "youtube_search": "🎥", 
         "YouTube": "🎥",
-        "Tavily": "🔍"
+        "Tavily": "🔍",
+        "local_index": "🗂️"
     }
     
     tool_names = {
         "wikipedia": "Wikipedia",
         "youtube_search": "YouTube", 
         "YouTube": "YouTube",
-        "Tavily": "Tavily"
+        "Tavily": "Tavily",
+        "local_index": "Local"
     }
     
     icon = tool_icons.get(result['tool'], "🔧")
@@ -261,6 +512,8 @@ def display_enhanced_results(result):
             display_wikipedia_results(content)
         elif result['tool'] == "Tavily":
             display_tavily_results(content)
+        elif result['tool'] == "local_index":
+            display_local_results(content)
         else:
             st.markdown(str(content))
     
@@ -289,19 +542,7 @@ def display_youtube_results(content):
     try:
         st.markdown("### 🎥 Video Search Results")
         
-        # The YouTube tool returns a string that looks like a Python list
-        youtube_urls = []
-        
-        if isinstance(content, str):
-            # Try to parse the string as a Python list using ast.literal_eval
-            try:
-                import ast
-                parsed_content = ast.literal_eval(content)
-                if isinstance(parsed_content, list):
-                    youtube_urls = parsed_content
-            except:
-                # If parsing fails, extract URLs using regex
-                youtube_urls = re.findall(r'(https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[a-zA-Z0-9_-]+[^\s\'\"\]]*)', content)
+        youtube_urls = parse_youtube_urls(content)
         
         if youtube_urls:
             st.markdown(f"Found {len(youtube_urls)} video(s)")
@@ -543,6 +784,107 @@ def display_tavily_results(content):
         st.markdown("**Raw content:**")
         st.code(str(content))
 
+def display_local_results(content):
+    """Display results answered from the local full-text index"""
+    query = content.get('query', '')
+    results = content.get('results', [])
+
+    st.markdown(f"### 🗂️ Local Index Results for: *{query}*")
+    st.caption(f"⚡ Answered offline in {content.get('response_time', 0) * 1000:.1f} ms • BM25 ranking")
+
+    if not results:
+        st.warning("No indexed results match this query yet. Search it with Wikipedia, YouTube or Tavily first to add it to the local index.")
+        return
+
+    st.markdown(f"**Found {len(results)} results:**")
+
+    for i, item in enumerate(results):
+        with st.container():
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.markdown(f"#### {i+1}. {item['title']}")
+            with col2:
+                stars = int(item.get('score', 0) * 5)
+                st.markdown(f"{'⭐' * stars}{'☆' * (5-stars)}")
+
+            if item.get('content'):
+                st.markdown(f"📝 {item['content']}")
+
+            col_source, col_button = st.columns([3, 1])
+            with col_source:
+                st.markdown(f"🌐 **Source:** [{urlparse(item['url']).netloc}]({item['url']}) • fetched via {item['source_tool']} for *{item['source_query']}*")
+            with col_button:
+                st.link_button("🔗 Visit", item['url'], type="secondary", use_container_width=True)
+
+            st.divider()
+
+def get_session_id():
+    """Return a session id that survives UI restarts by living in the page URL"""
+    if "session" not in st.query_params:
+        st.query_params["session"] = uuid.uuid4().hex
+    return st.query_params["session"]
+
+def store_job_result(session_id, job_id, result):
+    """Keep a finished worker job's result and drop the job from the shared store"""
+    st.session_state.last_result = result
+    if hasattr(st.session_state, 'pending_job'):
+        del st.session_state.pending_job
+
+    worker.save_session_state(session_id, {"last_result": result})
+    worker.delete_job(job_id)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def poll_pending_job():
+    """Show a placeholder that reruns the page once the pending worker job has finished"""
+    job_id = st.session_state.get('pending_job')
+    job = worker.get_job(job_id) if job_id else None
+    if job is None or job["status"] == "done":
+        st.rerun()
+
+    st.info("⏳ Your search is still running in the worker pool...")
+
+def check_pending_job():
+    """Pick up the pending worker job's result if it is done, without blocking the script thread"""
+    job_id = st.session_state.get('pending_job')
+    if not job_id:
+        return
+
+    result = worker.wait_for_job(job_id, timeout=0)
+    if result is None:
+        poll_pending_job()
+    else:
+        store_job_result(get_session_id(), job_id, result)
+
+def run_search(query, selected_tool, tools):
+    """Run a search inline or through the worker pool and keep its result in session state"""
+    if SERVING_MODE != "worker":
+        st.session_state.last_result = execute_tool(query, selected_tool, tools)
+        return
+
+    session_id = get_session_id()
+    if hasattr(st.session_state, 'last_result'):
+        del st.session_state.last_result
+
+    # A new search replaces whatever job this session was still waiting on
+    job_id = worker.submit_job(session_id, query, selected_tool)
+    st.session_state.pending_job = job_id
+    worker.save_session_state(session_id, {"pending_job": job_id})
+
+    # A short wait covers fast tools; anything slower is polled by later reruns
+    result = worker.wait_for_job(job_id, timeout=JOB_WAIT_SECONDS)
+    if result is not None:
+        store_job_result(session_id, job_id, result)
+
+def clear_result():
+    """Clear the current result from session state and the shared store"""
+    if hasattr(st.session_state, 'last_result'):
+        del st.session_state.last_result
+    if hasattr(st.session_state, 'pending_job'):
+        del st.session_state.pending_job
+
+    if SERVING_MODE == "worker":
+        worker.save_session_state(get_session_id(), {})
+
 def main():
     st.set_page_config(
         page_title="LangChain Tools Playground",
@@ -563,8 +905,17 @@ def main():
     📚 [Explore more LangChain tools](https://python.langchain.com/docs/integrations/tools/)
     """)
     
-    # Initialize tools
-    tools = initialize_tools()
+    # Initialize tools (in worker mode they live in the worker processes instead)
+    tools = None if SERVING_MODE == "worker" else initialize_tools()
+    
+    # Restore results kept in the shared store, e.g. after a UI worker restart
+    if (SERVING_MODE == "worker" and not hasattr(st.session_state, 'last_result')
+            and not hasattr(st.session_state, 'pending_job')):
+        saved_state = worker.load_session_state(get_session_id())
+        if saved_state.get('pending_job'):
+            st.session_state.pending_job = saved_state['pending_job']
+        elif saved_state.get('last_result'):
+            st.session_state.last_result = saved_state['last_result']
     
     # Handle suggestion clicks
     if hasattr(st.session_state, 'suggested_query') and st.session_state.get('auto_execute', False):
@@ -573,8 +924,7 @@ def main():
         
         # Execute search with suggested query
         with st.spinner(f"Searching with {st.session_state.get('last_selected_tool', 'Wikipedia')}..."):
-            result = execute_tool(suggested_query, st.session_state.get('last_selected_tool', 'Wikipedia'), tools)
-            st.session_state.last_result = result
+            run_search(suggested_query, st.session_state.get('last_selected_tool', 'Wikipedia'), tools)
         
         st.success(f"✅ Searched for: '{suggested_query}'")
     
@@ -598,7 +948,7 @@ def main():
         st.subheader("🛠️ Select Tool")
         selected_tool = st.radio(
             "Choose a tool for your search:",
-            options=["Wikipedia", "YouTube", "Tavily"],
+            options=["Wikipedia", "YouTube", "Tavily", "Local"],
             horizontal=True,
             help="Each tool provides different types of information sources"
         )
@@ -625,8 +975,7 @@ def main():
     # Reset functionality
     if reset_button:
         # Clear search results
-        if hasattr(st.session_state, 'last_result'):
-            del st.session_state.last_result
+        clear_result()
         
         # Increment reset counter to create new widget with fresh state
         st.session_state.reset_counter += 1
@@ -646,8 +995,7 @@ def main():
         
         if not is_valid:
             # Clear any previous results when validation fails
-            if hasattr(st.session_state, 'last_result'):
-                del st.session_state.last_result
+            clear_result()
                 
             st.error(validation_message)
             
@@ -664,11 +1012,12 @@ def main():
                             st.rerun()
             
             # Show tool-specific examples
-            if selected_tool in ["YouTube", "Wikipedia", "Tavily"]:
+            if selected_tool in ["YouTube", "Wikipedia", "Tavily", "Local"]:
                 examples = {
                     "YouTube": ["python tutorial", "cooking recipes", "music videos", "documentary films"],
                     "Wikipedia": ["artificial intelligence", "history of Rome", "climate change", "quantum physics"],
-                    "Tavily": ["latest AI news", "weather forecast", "stock market updates", "current events"]
+                    "Tavily": ["latest AI news", "weather forecast", "stock market updates", "current events"],
+                    "Local": ["artificial intelligence", "climate change", "python tutorial", "any topic you searched before"]
                 }
                 
                 st.info(f"💡 **{selected_tool} Example Searches:**")
@@ -678,10 +1027,12 @@ def main():
                         st.markdown(f"• {example}")
         else:
             with st.spinner(f"Searching with {selected_tool}..."):
-                result = execute_tool(user_query, selected_tool, tools)
-                
                 # Store result in session state
-                st.session_state.last_result = result
+                run_search(user_query, selected_tool, tools)
+    
+    # Pick up a search still running in the worker pool (checked after any new submit replaced it)
+    if SERVING_MODE == "worker":
+        check_pending_job()
     
     # Display results
     if hasattr(st.session_state, 'last_result'):
@@ -696,6 +1047,7 @@ def main():
         "⚡ **Fast responses** - Direct API access without model inference delays",
         "🎯 **Structured output** - Consistent JSON formatting for all responses",
         "🔧 **Multiple sources** - Access Wikipedia, YouTube, and web search in one place",
+        "🗂️ **Offline search** - Every fetched result is indexed locally for instant repeat lookups",
         "💰 **Cost-effective** - No token usage for search operations",
         "🔒 **Secure** - API keys managed through environment variables"
     ]
@@ -719,6 +1071,10 @@ def main():
             "Tavily": {
                 "description": "Comprehensive web search engine",
                 "use_case": "Current events, recent information, web content"
+            },
+            "Local": {
+                "description": "Full-text index of everything fetched so far",
+                "use_case": "Offline search, instant repeat lookups"
             }
         }
         
@@ -727,5 +1083,13 @@ def main():
                 st.write(f"**Description:** {info['description']}")
                 st.write(f"**Best for:** {info['use_case']}")
 
+        try:
+            st.caption(f"🗂️ Local index: {count_indexed_documents():,} documents")
+        except sqlite3.Error:
+            st.caption("🗂️ Local index unavailable")
+
+        if SERVING_MODE == "worker":
+            st.caption("⚙️ Serving mode: worker pool")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
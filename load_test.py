@@ -0,0 +1,384 @@
+import os
+import json
+import math
+import time
+import pickle
+import logging
+import random
+import argparse
+import tempfile
+import threading
+import multiprocessing
+from unittest.mock import MagicMock
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.components.v2.component_manager import BidiComponentManager
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.dataframe_source_manager import DataframeSourceManager
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+from streamlit.testing.v1.util import patch_config_options
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Script each simulated session runs: the real app.main() with stub tools swapped in
+HARNESS_SCRIPT = """
+import sys
+if {app_dir!r} not in sys.path:
+    sys.path.insert(0, {app_dir!r})
+import app
+import load_test
+app.initialize_tools = lambda: load_test.build_stub_tools({latency!r}, {payload_kb!r})
+app.main()
+"""
+
+# A query validate_search_input flags as a typo, so the suggestion buttons are rendered
+TYPO_QUERY = "python language"
+
+FILLER_WORDS = (
+    "the quick brown fox jumps over the lazy dog while researchers study climate "
+    "history science technology culture geography music art language learning"
+).split()
+
+# Bytes of protobuf deltas sent by the rerun the current thread is driving, see count_deltas()
+_counters = threading.local()
+
+def filler_text(size):
+    """Return roughly `size` characters of paragraph text"""
+    words = []
+    length = 0
+    while length < size:
+        word = FILLER_WORDS[len(words) % len(FILLER_WORDS)]
+        words.append(word)
+        length += len(word) + 1
+        if len(words) % 60 == 0:
+            words.append("\n\n")
+    return " ".join(words)[:size]
+
+def make_payload(tool_name, query, payload_kb):
+    """Build a synthetic response shaped like the real tool's output"""
+    text = filler_text(int(payload_kb * 1024))
+
+    if tool_name == "Wikipedia":
+        chunk = max(1, len(text) // 3)
+        return "\n\n".join(
+            f"Page: {query.title()} {i+1}\nSummary: {text[i*chunk:(i+1)*chunk]}" for i in range(3)
+        )
+    elif tool_name == "YouTube":
+        return str([f"https://www.youtube.com/watch?v={i:011d}&pp=stub" for i in range(5)])
+    elif tool_name == "Tavily":
+        chunk = max(1, len(text) // 8)
+        return {
+            "query": query,
+            "answer": text[:200],
+            "results": [
+                {
+                    "title": f"{query.title()} result {i+1}",
+                    "url": f"https://example.com/{query.replace(' ', '-')}/{i+1}",
+                    "content": text[i*chunk:(i+1)*chunk],
+                    "score": round(1 - i * 0.1, 2)
+                }
+                for i in range(8)
+            ],
+            "images": [],
+            "follow_up_questions": None
+        }
+    return text
+
+class StubTool:
+    """Stand-in for a LangChain tool with configurable latency and payload size"""
+
+    def __init__(self, tool_name, latency, payload_kb):
+        self.tool_name = tool_name
+        self.latency = latency
+        self.payload_kb = payload_kb
+
+    def invoke(self, query):
+        time.sleep(self.latency)
+        return make_payload(self.tool_name, query, self.payload_kb)
+
+def build_stub_tools(latency, payload_kb):
+    """Return the app's tool set with every upstream tool replaced by a stub"""
+    import app
+
+    tools = {
+        tool_name: StubTool(tool_name, latency, payload_kb)
+        for tool_name in ["Wikipedia", "YouTube", "Tavily"]
+    }
+    # The Local tool is already offline, so it runs for real against the stub-fed index
+    tools["Local"] = app.LocalIndexSearch()
+    return tools
+
+def share_runtime():
+    """Let AppTest sessions run concurrently in one process, the way sessions share one server"""
+    # AppTest installs a fresh mock Runtime before every run and clears it afterwards, which
+    # would pull the runtime out from under overlapping runs; give them all one instead
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.dataframe_source_mgr = DataframeSourceManager()
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    runtime.bidi_component_registry = BidiComponentManager()
+    runtime.bidi_component_registry.discover_and_register_components(start_file_watching=False)
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    # Overlapping config patches would restore each other's mocks, so run_sessions patches it once
+    app_test.patch_config_options = lambda overrides: nullcontext()
+
+def count_deltas():
+    """Count the size of every ForwardMsg the script runner would send over the websocket"""
+    original_enqueue = ForwardMsgQueue.enqueue
+    original_run = LocalScriptRunner.run
+
+    def enqueue(self, msg):
+        # Called from the script thread, so the total is kept on the session's own queue
+        self.sent_bytes = getattr(self, "sent_bytes", 0) + msg.ByteSize()
+        original_enqueue(self, msg)
+
+    def run(self, *args, **kwargs):
+        # Called from the thread driving the session, once per AppTest.run()
+        try:
+            return original_run(self, *args, **kwargs)
+        finally:
+            _counters.delta_bytes += getattr(self.forward_msg_queue, "sent_bytes", 0)
+
+    ForwardMsgQueue.enqueue = enqueue
+    LocalScriptRunner.run = run
+
+def session_state_bytes(at):
+    """Return (last_result bytes, total user session state bytes) for a simulated session"""
+    result_bytes = 0
+    total_bytes = 0
+    for key, value in at.session_state.items():
+        # Widget values are keyed by internal ids; only count the app's own state
+        if key.startswith("$$"):
+            continue
+        try:
+            size = len(pickle.dumps(value))
+        except Exception:
+            continue
+        total_bytes += size
+        if key == "last_result":
+            result_bytes = size
+    return result_bytes, total_bytes
+
+def find_button(at, prefix):
+    """Return the first button whose label starts with `prefix`, or None"""
+    for button in at.button:
+        if button.label.startswith(prefix):
+            return button
+    return None
+
+def search_step(at, query, tool_name):
+    at.text_area[0].input(query)
+    at.radio[0].set_value(tool_name)
+    find_button(at, "🚀").click()
+    at.run()
+
+def suggestion_step(at, rng):
+    import app
+
+    # What clicking a "Did you mean" button leaves behind before its st.rerun()
+    _, _, suggestions = app.validate_search_input(TYPO_QUERY)
+    at.session_state["suggested_query"] = rng.choice(suggestions or app.COMMON_SEARCH_TERMS)
+    at.session_state["auto_execute"] = True
+    at.run()
+
+def reset_step(at):
+    find_button(at, "🔄").click().run()
+
+def run_session(session_id, script_path, options):
+    """Drive one simulated session through every step and return its samples and peak state size"""
+    import app
+
+    tools = options["tools"]
+    rng = random.Random(options["seed"] + session_id)
+    at = AppTest.from_file(script_path, default_timeout=options["timeout"])
+
+    steps = [("load", lambda: at.run())]
+    for _ in range(options["rounds"]):
+        steps.append(("search", lambda: search_step(at, rng.choice(app.COMMON_SEARCH_TERMS), rng.choice(tools))))
+        steps.append(("typo", lambda: search_step(at, TYPO_QUERY, rng.choice(tools))))
+        steps.append(("suggestion", lambda: suggestion_step(at, rng)))
+    steps.append(("reset", lambda: reset_step(at)))
+
+    samples = []
+    memory = (0, 0)
+    for step_name, step in steps:
+        _counters.delta_bytes = 0
+        start = time.perf_counter()
+        try:
+            step()
+            error = bool(at.exception)
+        except Exception:
+            error = True
+        samples.append({
+            "step": step_name,
+            "latency": time.perf_counter() - start,
+            "delta_bytes": _counters.delta_bytes,
+            "error": error
+        })
+
+        if step_name in ("search", "suggestion"):
+            result_bytes, total_bytes = session_state_bytes(at)
+            memory = (max(memory[0], result_bytes), max(memory[1], total_bytes))
+
+    return samples, memory
+
+def run_sessions(session_ids, script_path, options):
+    """Run a batch of simulated sessions concurrently in this process and return their samples"""
+    share_runtime()
+    count_deltas()
+    # The threads driving sessions touch session state outside a script run, which is expected here
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+
+    samples = []
+    memory = []
+    with patch_config_options({"global.appTest": True}):
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            futures = [pool.submit(run_session, session_id, script_path, options) for session_id in session_ids]
+            for future in futures:
+                session_samples, session_memory = future.result()
+                samples.extend(session_samples)
+                memory.append(session_memory)
+
+    return {"samples": samples, "memory": memory}
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+def summarize(batches, wall_time, args):
+    """Aggregate the samples of every worker process into a report dict"""
+    samples = [sample for batch in batches for sample in batch["samples"]]
+    memory = [entry for batch in batches for entry in batch["memory"]]
+
+    step_names = []
+    for sample in samples:
+        if sample["step"] not in step_names:
+            step_names.append(sample["step"])
+
+    def stats(group):
+        latencies = [sample["latency"] * 1000 for sample in group]
+        deltas = [sample["delta_bytes"] for sample in group]
+        return {
+            "count": len(group),
+            "errors": sum(sample["error"] for sample in group),
+            "p50_ms": percentile(latencies, 50),
+            "p90_ms": percentile(latencies, 90),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": max(latencies),
+            "delta_avg_bytes": sum(deltas) / len(deltas),
+            "delta_max_bytes": max(deltas)
+        }
+
+    result_sizes = [entry[0] for entry in memory] or [0]
+    state_sizes = [entry[1] for entry in memory] or [0]
+
+    return {
+        "config": {
+            "sessions": args.sessions,
+            "processes": args.processes,
+            "concurrency": args.concurrency,
+            "rounds": args.rounds,
+            "latency": args.latency,
+            "payload_kb": args.payload_kb,
+            "tools": args.tools
+        },
+        "wall_time_s": wall_time,
+        "interactions_per_s": len(samples) / wall_time,
+        "steps": {step_name: stats([s for s in samples if s["step"] == step_name]) for step_name in step_names},
+        "overall": stats(samples),
+        "session_state": {
+            "last_result_avg_bytes": sum(result_sizes) / len(result_sizes),
+            "last_result_max_bytes": max(result_sizes),
+            "total_avg_bytes": sum(state_sizes) / len(state_sizes),
+            "total_max_bytes": max(state_sizes)
+        }
+    }
+
+def print_report(report):
+    config = report["config"]
+    print(f"\n🎮 Load test: {config['sessions']} sessions across {config['processes']} process(es), "
+          f"up to {config['concurrency']} at once per process, {config['rounds']} round(s) each")
+    print(f"Stub tools: {', '.join(config['tools'])} • {config['latency'] * 1000:.0f} ms latency • "
+          f"{config['payload_kb']} KB payload")
+    print(f"Wall time: {report['wall_time_s']:.2f} s • Throughput: {report['interactions_per_s']:.1f} interactions/s\n")
+
+    header = f"{'Interaction':<12}{'Count':>7}{'Errors':>8}{'p50 ms':>9}{'p90 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Max ms':>9}{'Delta KB':>10}{'Max KB':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["steps"].items()) + [("overall", report["overall"])]
+    for step_name, stats in rows:
+        print(f"{step_name:<12}{stats['count']:>7}{stats['errors']:>8}{stats['p50_ms']:>9.1f}{stats['p90_ms']:>9.1f}"
+              f"{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+              f"{stats['delta_avg_bytes'] / 1024:>10.1f}{stats['delta_max_bytes'] / 1024:>9.1f}")
+
+    memory = report["session_state"]
+    print(f"\nSession state per session: last_result avg {memory['last_result_avg_bytes'] / 1024:.1f} KB "
+          f"(max {memory['last_result_max_bytes'] / 1024:.1f} KB), total avg {memory['total_avg_bytes'] / 1024:.1f} KB "
+          f"(max {memory['total_max_bytes'] / 1024:.1f} KB)")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load test app.py with many concurrent simulated Streamlit sessions against stub tools"
+    )
+    parser.add_argument("--sessions", type=int, default=100, help="Number of simulated sessions (default: 100)")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Processes the sessions are spread across, each like one Streamlit server (default: 1)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Sessions running at once in each process (default: all of them)")
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="Search, typo and suggestion rounds per session (default: 3)")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub tool latency in seconds (default: 0.2)")
+    parser.add_argument("--payload-kb", type=float, default=20, help="Stub tool payload size in KB (default: 20)")
+    parser.add_argument("--tools", default="Wikipedia,YouTube,Tavily,Local",
+                        help="Comma-separated tools the sessions pick from (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for query and tool choice")
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+    args.tools = [tool.strip() for tool in args.tools.split(",")]
+    args.processes = max(1, min(args.processes, args.sessions))
+    args.concurrency = max(1, args.concurrency or math.ceil(args.sessions / args.processes))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Sessions must never touch the real index or the worker pool
+        os.environ["LOCAL_INDEX_PATH"] = os.path.join(tmp_dir, "local_index.db")
+        os.environ["SERVING_MODE"] = "inline"
+
+        script_path = os.path.join(tmp_dir, "load_test_app.py")
+        with open(script_path, "w") as f:
+            f.write(HARNESS_SCRIPT.format(app_dir=APP_DIR, latency=args.latency, payload_kb=args.payload_kb))
+
+        options = {
+            "tools": args.tools,
+            "rounds": args.rounds,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "timeout": args.latency + 30
+        }
+        batches = [list(range(args.sessions))[i::args.processes] for i in range(args.processes)]
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.processes) as pool:
+            results = pool.starmap(run_sessions, [(batch, script_path, options) for batch in batches])
+        wall_time = time.perf_counter() - start
+
+    report = summarize(results, wall_time, args)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json_path}")
+
+if __name__ == "__main__":
+    main()
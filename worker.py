@@ -0,0 +1,317 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Shared local store for jobs and session results, used when SERVING_MODE=worker
+SHARED_STORE_PATH = os.getenv("SHARED_STORE_PATH", "playground_state.db")
+
+# A running job whose worker has not reported back within the lease is handed out again
+JOB_LEASE_SECONDS = 300
+MAX_JOB_ATTEMPTS = 3
+
+# Jobs no worker picks up in time (e.g. worker.py is not running) and jobs that outlive
+# every lease are failed, so the UI shows an error instead of polling forever
+QUEUE_TIMEOUT_SECONDS = 60
+JOB_TIMEOUT_SECONDS = JOB_LEASE_SECONDS * MAX_JOB_ATTEMPTS
+
+# Finished jobs nobody collected and sessions nobody touched are purged after these ages
+JOB_RETENTION_SECONDS = 3600
+SESSION_RETENTION_SECONDS = int(os.getenv("SESSION_RETENTION_SECONDS", str(7 * 24 * 3600)))
+PURGE_INTERVAL_SECONDS = 60
+
+SHARED_STORE_SCHEMA = """
+PRAGMA journal_mode=WAL;
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    query TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    created_at REAL NOT NULL,
+    claimed_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created_at);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Tools are initialized once per worker process, not once per job
+_tools = None
+
+# Store files whose schema has already been set up by this process
+_initialized_stores = set()
+
+def get_store_connection(store_path=None):
+    """Open the shared store, creating the schema on first use"""
+    store_path = store_path or SHARED_STORE_PATH
+    conn = sqlite3.connect(store_path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    if store_path not in _initialized_stores:
+        conn.executescript(SHARED_STORE_SCHEMA)
+        _initialized_stores.add(store_path)
+    return conn
+
+def submit_job(session_id, query, tool_name, store_path=None):
+    """Queue a search for the worker pool and return its job id"""
+    job_id = uuid.uuid4().hex
+    conn = get_store_connection(store_path)
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO jobs (id, session_id, tool, query, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, session_id, tool_name, query, time.time())
+            )
+    finally:
+        conn.close()
+    return job_id
+
+def expire_stale_jobs(conn, job_id=None):
+    """Fail queued jobs no worker claimed in time and jobs past their overall deadline"""
+    now = time.time()
+    timeout_result = json.dumps({
+        "tool": "worker",
+        "error": "Search timed out waiting for the worker pool. Is worker.py running?",
+        "content": "Error executing search in the worker pool"
+    })
+    with conn:
+        conn.execute(
+            """
+            UPDATE jobs SET status = 'done', result = ?, finished_at = ?
+            WHERE (? IS NULL OR id = ?) AND (
+                (status = 'queued' AND COALESCE(claimed_at, created_at) < ?)
+                OR (status = 'running' AND created_at < ?)
+            )
+            """,
+            (timeout_result, now, job_id, job_id, now - QUEUE_TIMEOUT_SECONDS, now - JOB_TIMEOUT_SECONDS)
+        )
+
+def get_job(job_id, store_path=None):
+    """Return a job as a dict with its decoded result, or None if it does not exist"""
+    conn = get_store_connection(store_path)
+    try:
+        expire_stale_jobs(conn, job_id)
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+
+    if row is None:
+        return None
+
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    return job
+
+def wait_for_job(job_id, timeout=60, poll_interval=0.1, store_path=None):
+    """Poll until a job is done and return its result, or None if it is still pending after the timeout"""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = get_job(job_id, store_path)
+        if job is None:
+            return {
+                "tool": "worker",
+                "error": f"Job {job_id} not found or expired",
+                "content": "Error retrieving search result"
+            }
+        if job["status"] == "done":
+            return job["result"]
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(poll_interval)
+
+def claim_jobs(limit, store_path=None):
+    """Atomically claim up to `limit` queued (or lease-expired) jobs for this worker"""
+    now = time.time()
+    conn = get_store_connection(store_path)
+    try:
+        with conn:
+            # Jobs that keep crashing their worker are failed instead of being retried forever
+            give_up = json.dumps({
+                "tool": "worker",
+                "error": f"Job failed after {MAX_JOB_ATTEMPTS} attempts",
+                "content": "Error executing search in the worker pool"
+            })
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'done', result = ?, finished_at = ?
+                WHERE status = 'running' AND claimed_at < ? AND attempts >= ?
+                """,
+                (give_up, now, now - JOB_LEASE_SECONDS, MAX_JOB_ATTEMPTS)
+            )
+            rows = conn.execute(
+                """
+                UPDATE jobs SET status = 'running', claimed_at = ?, attempts = attempts + 1
+                WHERE id IN (
+                    SELECT id FROM jobs
+                    WHERE status = 'queued' OR (status = 'running' AND claimed_at < ?)
+                    ORDER BY created_at
+                    LIMIT ?
+                )
+                RETURNING id, tool, query
+                """,
+                (now, now - JOB_LEASE_SECONDS, limit)
+            ).fetchall()
+    finally:
+        conn.close()
+    return [dict(row) for row in rows]
+
+def complete_job(job_id, result, store_path=None):
+    """Store a job's result and mark it done"""
+    conn = get_store_connection(store_path)
+    try:
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished_at = ? WHERE id = ?",
+                (json.dumps(result, default=str), time.time(), job_id)
+            )
+    finally:
+        conn.close()
+
+def release_jobs(job_ids, store_path=None):
+    """Put claimed jobs that never reached a worker process back in the queue"""
+    conn = get_store_connection(store_path)
+    try:
+        with conn:
+            conn.executemany(
+                "UPDATE jobs SET status = 'queued', attempts = attempts - 1 WHERE id = ? AND status = 'running'",
+                [(job_id,) for job_id in job_ids]
+            )
+    finally:
+        conn.close()
+
+def delete_job(job_id, store_path=None):
+    """Remove a job once its result has been collected"""
+    conn = get_store_connection(store_path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+    finally:
+        conn.close()
+
+def purge_expired(store_path=None):
+    """Delete old finished jobs and stale sessions so the store does not grow without limit"""
+    now = time.time()
+    conn = get_store_connection(store_path)
+    try:
+        expire_stale_jobs(conn)
+        with conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE status = 'done' AND finished_at < ?",
+                (now - JOB_RETENTION_SECONDS,)
+            )
+            conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?",
+                (now - SESSION_RETENTION_SECONDS,)
+            )
+    finally:
+        conn.close()
+
+def save_session_state(session_id, state, store_path=None):
+    """Persist a session's results so any UI process can pick them up"""
+    conn = get_store_connection(store_path)
+    try:
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO sessions (session_id, state, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at
+                """,
+                (session_id, json.dumps(state, default=str), time.time())
+            )
+    finally:
+        conn.close()
+
+def load_session_state(session_id, store_path=None):
+    """Return a session's persisted state, or an empty dict for unknown sessions"""
+    conn = get_store_connection(store_path)
+    try:
+        row = conn.execute("SELECT state FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row["state"]) if row else {}
+
+def run_job(query, tool_name):
+    """Execute and format a search inside a worker process"""
+    global _tools
+    # Imported lazily so app.py can import this module without a cycle
+    import app
+
+    if _tools is None:
+        _tools = app.initialize_tools()
+    return app.execute_tool(query, tool_name, _tools)
+
+def serve(max_workers=None, poll_interval=0.1, store_path=None):
+    """Claim queued jobs and run them on a process pool until interrupted"""
+    max_workers = max_workers or os.cpu_count() or 1
+    in_flight = {}
+
+    def on_done(job_id, future):
+        try:
+            try:
+                result = future.result()
+            except BaseException as e:
+                # Includes KeyboardInterrupt raised in a child, so the job fails now instead of after its lease
+                result = {
+                    "tool": "worker",
+                    "error": str(e) or type(e).__name__,
+                    "content": "Error executing search in the worker pool"
+                }
+            complete_job(job_id, result, store_path)
+        finally:
+            # Free the slot even if the store write failed; the lease will hand the job out again
+            in_flight.pop(job_id, None)
+
+    pool = ProcessPoolExecutor(max_workers=max_workers)
+    print(f"Worker pool started with {max_workers} processes, store: {store_path or SHARED_STORE_PATH}")
+    last_purge = 0
+    try:
+        while True:
+            if time.monotonic() - last_purge >= PURGE_INTERVAL_SECONDS:
+                purge_expired(store_path)
+                last_purge = time.monotonic()
+
+            free_slots = max_workers - len(in_flight)
+            jobs = claim_jobs(free_slots, store_path) if free_slots > 0 else []
+            for i, job in enumerate(jobs):
+                try:
+                    future = pool.submit(run_job, job["query"], job["tool"])
+                except BrokenProcessPool:
+                    # A child died (crash, OOM kill); the jobs it held were already failed by
+                    # on_done, so requeue the ones not yet submitted and start a fresh pool
+                    print("Worker process died, restarting the pool...")
+                    release_jobs([unsubmitted["id"] for unsubmitted in jobs[i:]], store_path)
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = ProcessPoolExecutor(max_workers=max_workers)
+                    break
+                in_flight[job["id"]] = future
+                future.add_done_callback(lambda f, job_id=job["id"]: on_done(job_id, f))
+            if not jobs:
+                time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("Shutting down worker pool, waiting for in-flight jobs...")
+    finally:
+        pool.shutdown(wait=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the LangChain Tools Playground worker pool")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Seconds to wait between polls when the queue is empty")
+    args = parser.parse_args()
+
+    serve(max_workers=args.workers, poll_interval=args.poll_interval)
+
+if __name__ == "__main__":
+    main()